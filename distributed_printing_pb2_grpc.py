@@ -89,6 +89,11 @@ class MutualExclusionServiceStub(object):
                 request_serializer=distributed__printing__pb2.AccessRelease.SerializeToString,
                 response_deserializer=distributed__printing__pb2.Empty.FromString,
                 )
+        self.ReleaseAccessStream = channel.stream_unary(
+                '/distributed_printing.MutualExclusionService/ReleaseAccessStream',
+                request_serializer=distributed__printing__pb2.AccessRelease.SerializeToString,
+                response_deserializer=distributed__printing__pb2.Empty.FromString,
+                )
 
 
 class MutualExclusionServiceServicer(object):
@@ -107,6 +112,13 @@ class MutualExclusionServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def ReleaseAccessStream(self, request_iterator, context):
+        """Stream mantido aberto durante toda a vida do cliente para as liberações
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_MutualExclusionServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -120,6 +132,11 @@ def add_MutualExclusionServiceServicer_to_server(servicer, server):
                     request_deserializer=distributed__printing__pb2.AccessRelease.FromString,
                     response_serializer=distributed__printing__pb2.Empty.SerializeToString,
             ),
+            'ReleaseAccessStream': grpc.stream_unary_rpc_method_handler(
+                    servicer.ReleaseAccessStream,
+                    request_deserializer=distributed__printing__pb2.AccessRelease.FromString,
+                    response_serializer=distributed__printing__pb2.Empty.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'distributed_printing.MutualExclusionService', rpc_method_handlers)
@@ -164,3 +181,20 @@ class MutualExclusionService(object):
             distributed__printing__pb2.Empty.FromString,
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def ReleaseAccessStream(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_unary(request_iterator, target, '/distributed_printing.MutualExclusionService/ReleaseAccessStream',
+            distributed__printing__pb2.AccessRelease.SerializeToString,
+            distributed__printing__pb2.Empty.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
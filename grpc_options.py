@@ -0,0 +1,22 @@
+"""
+Opções gRPC Compartilhadas
+Canais (clientes) e servidores (clientes e impressora) precisam concordar
+sobre o keepalive, por isso as duas listas vivem juntas neste módulo.
+"""
+
+# Keepalive curto para detectar rapidamente a queda de um par (os streams
+# de liberação ficam abertos, então há sempre uma chamada ativa)
+CHANNEL_OPTS = [
+    ('grpc.keepalive_time_ms', 10000),
+    ('grpc.keepalive_timeout_ms', 5000),
+    ('grpc.http2.max_pings_without_data', 0),
+]
+
+# O servidor precisa aceitar os pings do keepalive acima; sem isso ele
+# encerra a conexão (GOAWAY too_many_pings) após alguns pings.
+# so_reuseport permite vários listeners na mesma porta
+SERVER_OPTS = [
+    ('grpc.max_concurrent_streams', 1000),
+    ('grpc.so_reuseport', 1),
+    ('grpc.http2.min_recv_ping_interval_without_data_ms', 5000),
+]
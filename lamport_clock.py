@@ -6,8 +6,10 @@ import threading
 
 class LamportClock:
     """
-    Implementação thread-safe do Relógio Lógico de Lamport
-    usando locks para garantir operações atômicas.
+    Implementação thread-safe do Relógio Lógico de Lamport.
+    
+    O valor do relógio é um int; tick() e update() o alteram sob um lock,
+    que torna max(local, recebido) + 1 atômico.
     """
     
     def __init__(self):
@@ -33,10 +35,16 @@ class LamportClock:
         
         Args:
             received_timestamp (int): Timestamp recebido de outro processo
-            
+        
         Returns:
             int: Novo valor do timestamp
         """
+        # Recebido <= local (ex.: ReleaseAccess atrasado): max + 1 é apenas
+        # um tick(). Evita o max(), mas o tick() ainda usa o lock. O relógio
+        # só cresce, então ler _time sem lock aqui é seguro
+        if received_timestamp <= self._time:
+            return self.tick()
+        
         with self._lock:
             self._time = max(self._time, received_timestamp) + 1
             return self._time
@@ -48,8 +56,8 @@ class LamportClock:
         Returns:
             int: Valor atual do timestamp
         """
-        with self._lock:
-            return self._time
+        # Leitura de um único atributo é atômica sob o GIL
+        return self._time
     
     def __str__(self):
         return f"LamportClock(time={self.get_time()})"
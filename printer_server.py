@@ -4,12 +4,22 @@ Apenas recebe requisições e imprime, sem participar da exclusão mútua.
 """
 import grpc
 from concurrent import futures
+import argparse
+import itertools
+import os
+import queue
 import time
 import sys
 import random
+import threading
 
 import distributed_printing_pb2
 import distributed_printing_pb2_grpc
+from grpc_options import SERVER_OPTS
+from queue_logging import get_logger
+
+
+_logger = get_logger('printer_server')
 
 
 class PrinterServiceImpl(distributed_printing_pb2_grpc.PrintingServiceServicer):
@@ -19,70 +29,155 @@ class PrinterServiceImpl(distributed_printing_pb2_grpc.PrintingServiceServicer):
     """
     
     def __init__(self):
-        self.print_count = 0
+        # Numeração dos trabalhos; next() é atômico sob o GIL
+        self._job_ids = itertools.count(1)
+        
+        # Fila de impressão ordenada por (timestamp de Lamport, ID do
+        # cliente), consumida por uma única thread: a impressora
+        self._print_queue = queue.PriorityQueue()
+        self._printer_thread = threading.Thread(
+            target=self._printer_worker,
+            name='impressora',
+            daemon=True
+        )
+        self._printer_thread.start()
     
     def SendToPrinter(self, request, context):
         """
-        Recebe uma requisição de impressão, imprime a mensagem
-        e retorna uma confirmação.
+        Recebe uma requisição de impressão, enfileira o trabalho
+        e retorna uma confirmação imediatamente.
         
         Args:
             request: PrintRequest contendo dados da impressão
             context: Contexto gRPC
             
         Returns:
-            PrintResponse: Confirmação da impressão
+            PrintResponse: Confirmação do recebimento do trabalho
         """
-        self.print_count += 1
-        
-        # Imprime a mensagem recebida
-        print(f"\n{'='*60}")
-        print(f"[TS: {request.lamport_timestamp}] CLIENTE {request.client_id}: {request.message_content}")
-        print(f"Requisição #{request.request_number}")
-        print(f"{'='*60}\n")
-        
-        # Simula tempo de impressão (2-3 segundos)
-        delay = random.uniform(2.0, 3.0)
-        print(f"[SERVIDOR] Imprimindo... (aguarde {delay:.1f}s)")
-        time.sleep(delay)
-        
-        print(f"[SERVIDOR] Impressão #{self.print_count} concluída!\n")
+        job_id = next(self._job_ids)
+        self._print_queue.put(
+            (request.lamport_timestamp, request.client_id, job_id, request)
+        )
         
-        # Retorna confirmação
+        # Retorna confirmação sem esperar a impressão
         return distributed_printing_pb2.PrintResponse(
             success=True,
-            confirmation_message=f"Impressão #{self.print_count} concluída com sucesso",
+            confirmation_message=f"Impressão #{job_id} enfileirada",
             lamport_timestamp=request.lamport_timestamp
         )
+    
+    def _printer_worker(self):
+        """
+        Imprime os trabalhos da fila, um de cada vez, simulando o
+        tempo de impressão. Executado na thread da impressora.
+        """
+        while True:
+            _, _, job_id, request = self._print_queue.get()
+            
+            # Imprime a mensagem recebida
+            _logger.info(
+                "\n%s\n[TS: %d] CLIENTE %d: %s\nRequisição #%d\n%s\n",
+                '='*60, request.lamport_timestamp, request.client_id,
+                request.message_content, request.request_number, '='*60
+            )
+            
+            # Simula tempo de impressão (2-3 segundos); só a thread da
+            # impressora sorteia, então o gerador global não tem disputa
+            delay = random.uniform(2.0, 3.0)
+            _logger.info("[SERVIDOR] Imprimindo... (aguarde %.1fs)", delay)
+            time.sleep(delay)
+            
+            _logger.info("[SERVIDOR] Impressão #%d concluída!\n", job_id)
 
 
-def serve():
+def parse_arguments():
+    """Processa argumentos da linha de comando"""
+    parser = argparse.ArgumentParser(description='Servidor de Impressão')
+    
+    parser.add_argument(
+        '--grpc-workers',
+        type=int,
+        default=None,
+        help='Threads do gRPC por listener (padrão: núcleos / listeners, no mínimo 1)'
+    )
+    
+    parser.add_argument(
+        '--listeners',
+        type=int,
+        default=None,
+        help='Servidores gRPC escutando na mesma porta via SO_REUSEPORT (padrão: núcleos da CPU)'
+    )
+    
+    return parser.parse_args()
+
+
+def _serve_one(servicer, port, grpc_workers):
     """
-    Inicia o servidor de impressão na porta 50051
+    Inicia um servidor gRPC na porta informada. Com SO_REUSEPORT
+    vários servidores podem escutar na mesma porta; o kernel
+    distribui as conexões entre eles.
+    
+    Returns:
+        grpc.Server: Servidor já iniciado
     """
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+    server = grpc.server(
+        futures.ThreadPoolExecutor(max_workers=grpc_workers),
+        options=SERVER_OPTS
+    )
     
     distributed_printing_pb2_grpc.add_PrintingServiceServicer_to_server(
-        PrinterServiceImpl(), 
+        servicer, 
         server
     )
     
-    port = 50051
     server.add_insecure_port(f'[::]:{port}')
     server.start()
+    return server
+
+
+def serve(grpc_workers=None, listeners=None):
+    """
+    Inicia o servidor de impressão na porta 50051.
+    
+    O processo cria listeners x grpc_workers threads do gRPC. Por padrão
+    há um listener por núcleo e os núcleos são divididos entre eles, de
+    modo que o total de threads fica próximo do número de núcleos.
+    
+    Args:
+        grpc_workers (int): Threads do gRPC por listener
+        listeners (int): Servidores escutando na mesma porta
+    """
+    port = 50051
+    
+    # os.cpu_count() pode retornar None quando não é possível determiná-lo
+    cpus = os.cpu_count() or 1
+    listeners = listeners or cpus
+    grpc_workers = grpc_workers or max(1, cpus // listeners)
+    
+    # Todos os listeners compartilham o mesmo servicer (e a mesma fila)
+    servicer = PrinterServiceImpl()
+    servers = [
+        _serve_one(servicer, port, grpc_workers)
+        for _ in range(listeners)
+    ]
     
     print(f"{'='*60}")
     print(f"SERVIDOR DE IMPRESSÃO INICIADO")
     print(f"Porta: {port}")
+    print(f"Listeners: {len(servers)}")
+    print(f"Threads por listener: {grpc_workers}")
     print(f"Status: Aguardando requisições...")
     print(f"{'='*60}\n")
     
     try:
-        server.wait_for_termination()
+        for server in servers:
+            server.wait_for_termination()
     except KeyboardInterrupt:
         print("\n[SERVIDOR] Encerrando servidor de impressão...")
-        server.stop(0)
+        for server in servers:
+            server.stop(0)
 
 
 if __name__ == '__main__':
-    serve()
+    args = parse_arguments()
+    serve(args.grpc_workers, args.listeners)
\ No newline at end of file
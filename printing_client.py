@@ -7,20 +7,73 @@ from concurrent import futures
 import time
 import threading
 import argparse
+import collections
+import itertools
+import os
+import queue
 import random
 import sys
-from enum import Enum
 
 import distributed_printing_pb2
 import distributed_printing_pb2_grpc
+from grpc_options import CHANNEL_OPTS, SERVER_OPTS
 from lamport_clock import LamportClock
+from queue_logging import get_logger
 
 
-class MutexState(Enum):
-    """Estados do processo na exclusão mútua"""
-    RELEASED = "RELEASED"  # Não está interessado no recurso
-    WANTED = "WANTED"      # Quer acessar o recurso
-    HELD = "HELD"          # Está usando o recurso
+_logger = get_logger('printing_client')
+
+# Prazo (s) para receber todas as respostas de uma requisição de acesso
+_REQUEST_TIMEOUT = 5.0
+
+_tls = threading.local()
+
+
+def _rng():
+    """Retorna o gerador aleatório da thread atual (criado sob demanda)"""
+    rng = getattr(_tls, 'rng', None)
+    if rng is None:
+        rng = _tls.rng = random.Random()
+    return rng
+
+
+# Estados do processo na exclusão mútua (ints: comparação e indexação
+# direto em C, sem lookup de atributo de Enum)
+RELEASED = 0  # Não está interessado no recurso
+WANTED = 1    # Quer acessar o recurso
+HELD = 2      # Está usando o recurso
+
+_STATE_NAMES = ('RELEASED', 'WANTED', 'HELD')
+
+
+class ChannelPool:
+    """
+    Pool de canais gRPC para um mesmo destino, usado em round-robin.
+    Com um único canal todas as chamadas concorrentes compartilham uma
+    conexão HTTP/2; com vários, as rajadas de requisições se distribuem
+    entre conexões TCP independentes.
+    """
+    
+    def __init__(self, address, stub_class, size=4):
+        # Subchannel pool local: sem isso o gRPC reaproveita a mesma
+        # conexão para canais com o mesmo destino e argumentos
+        options = CHANNEL_OPTS + [('grpc.use_local_subchannel_pool', 1)]
+        self.channels = [
+            grpc.insecure_channel(address, options=options)
+            for _ in range(size)
+        ]
+        self.stubs = [stub_class(channel) for channel in self.channels]
+        # next() de itertools.count é atômico sob o GIL
+        self._idx = itertools.count()
+    
+    def next_stub(self):
+        """Retorna o próximo stub do pool (round-robin)"""
+        return self.stubs[next(self._idx) % len(self.stubs)]
+    
+    def close(self):
+        """Fecha todos os canais do pool"""
+        for channel in self.channels:
+            channel.close()
 
 
 class MutualExclusionServiceImpl(distributed_printing_pb2_grpc.MutualExclusionServiceServicer):
@@ -53,7 +106,8 @@ class MutualExclusionServiceImpl(distributed_printing_pb2_grpc.MutualExclusionSe
         
         self.client.log(
             f"Recebida requisição do Cliente {client_id} "
-            f"(TS: {req_timestamp}, Req: {req_number})"
+            f"(TS: {req_timestamp}, Req: {req_number})",
+            ts=new_time
         )
         
         # Decide se responde imediatamente ou adia
@@ -61,17 +115,22 @@ class MutualExclusionServiceImpl(distributed_printing_pb2_grpc.MutualExclusionSe
         
         with self.client.state_lock:
             current_state = self.client.state
+            # Lida junto com o estado: a liberação só incrementa a geração
+            # depois de sair de HELD/WANTED, então um pedido adiado aqui
+            # sempre será acordado pela próxima liberação
+            generation = self.client.release_generation
             
             # Se está usando o recurso (HELD), deve adiar
-            if current_state == MutexState.HELD:
+            if current_state == HELD:
                 should_defer = True
                 self.client.log(
                     f"Adiando resposta para Cliente {client_id} "
-                    f"(Estado: {current_state.value})"
+                    f"(Estado: {_STATE_NAMES[current_state]})",
+                    ts=new_time
                 )
             
             # Se quer o recurso (WANTED), compara timestamps
-            elif current_state == MutexState.WANTED:
+            elif current_state == WANTED:
                 # Desempate: menor timestamp tem prioridade
                 # Se timestamps iguais, menor ID tem prioridade
                 my_ts = self.client.my_request_timestamp
@@ -81,31 +140,49 @@ class MutualExclusionServiceImpl(distributed_printing_pb2_grpc.MutualExclusionSe
                     should_defer = True
                     self.client.log(
                         f"Adiando resposta para Cliente {client_id} "
-                        f"(meu TS: {my_ts} < recebido: {req_timestamp})"
+                        f"(meu TS: {my_ts} < recebido: {req_timestamp})",
+                        ts=new_time
                     )
+            
+            if should_defer:
+                # deque.append é atômico; registrar ainda sob state_lock
+                # garante que a próxima liberação encontre este ID
+                self.client.deferred_replies.append(client_id)
         
         if should_defer:
-
-            # CORREÇÃO DE SEÇÃO CRÍTICA 
-            ## cria um evento de sinal pra essa req especifica
-            reply_event = threading.Event()
+            # Se o solicitante desistir (prazo esgotado ou cancelamento), o
+            # callback acorda esta thread para devolvê-la ao pool; sem isso
+            # ela ficaria presa até a próxima liberação
+            def wake():
+                with self.client.release_cond:
+                    self.client.release_cond.notify_all()
             
-            # Adiciona à fila de respostas adiadas
-            with self.client.deferred_lock:
-                self.client.deferred_replies.append((client_id, reply_event))
-
-            ## deixar esperando atpe release critical section chamar release event
-            reply_event.wait()
-
-            ## "acorda" e responde
-            self.client.log(f"Concedendo acesso (atrasado) ao Cliente {client_id}")
+            # add_callback retorna False se a chamada já terminou
+            active = context.add_callback(wake)
+            
+            # Aguarda a próxima liberação do recurso (geração > a lida acima)
+            with self.client.release_cond:
+                if active:
+                    self.client.release_cond.wait_for(
+                        lambda: self.client.release_generation > generation
+                        or not context.is_active()
+                    )
+                released = self.client.release_generation > generation
+                # Todas as respostas adiadas usam o timestamp da liberação
+                release_ts = self.client.last_release_ts
+            
+            if not released:
+                self.client.log(f"Cliente {client_id} desistiu da requisição adiada")
+                return distributed_printing_pb2.AccessResponse(access_granted=False)
+            
+            self.client.log(f"Concedendo acesso (atrasado) ao Cliente {client_id}", ts=release_ts)
             return distributed_printing_pb2.AccessResponse(
                 access_granted=True,
-                lamport_timestamp=self.client.clock.tick() # Atualiza o relógio no momento do envio
+                lamport_timestamp=release_ts
             )
         else:
             # Responde imediatamente
-            self.client.log(f"Concedendo acesso ao Cliente {client_id}")
+            self.client.log(f"Concedendo acesso ao Cliente {client_id}", ts=new_time)
             return distributed_printing_pb2.AccessResponse(
                 access_granted=True,
                 lamport_timestamp=new_time
@@ -123,19 +200,30 @@ class MutualExclusionServiceImpl(distributed_printing_pb2_grpc.MutualExclusionSe
             Empty: Resposta vazia
         """
         # Atualiza relógio
-        self.client.clock.update(request.lamport_timestamp)
+        new_time = self.client.clock.update(request.lamport_timestamp)
         
         self.client.log(
             f"Cliente {request.client_id} liberou o recurso "
-            f"(Req: {request.request_number})"
+            f"(Req: {request.request_number})",
+            ts=new_time
         )
         
-        # Decrementa contador de respostas pendentes
-        # with self.client.reply_lock:
-        #     if self.client.pending_replies > 0:
-        #         self.client.pending_replies -= 1
-        #         if self.client.pending_replies == 0:
-        #             self.client.reply_event.set()
+        return distributed_printing_pb2.Empty()
+    
+    def ReleaseAccessStream(self, request_iterator, context):
+        """
+        Recebe as liberações de outro cliente por um stream de longa duração,
+        evitando abrir uma chamada gRPC por liberação.
+        
+        Args:
+            request_iterator: AccessRelease enviados pelo outro cliente
+            context: Contexto gRPC
+            
+        Returns:
+            Empty: Resposta vazia, ao fim do stream
+        """
+        for request in request_iterator:
+            self.ReleaseAccess(request, context)
         
         return distributed_printing_pb2.Empty()
 
@@ -146,51 +234,100 @@ class PrintingClient:
     e se comunica com o servidor de impressão.
     """
     
-    def __init__(self, client_id, port, peer_addresses, printer_address):
+    def __init__(self, client_id, port, peer_addresses, printer_address,
+                 channel_pool_size=4, grpc_workers=None):
         self.client_id = client_id
         self.port = port
         self.peer_addresses = peer_addresses
         self.printer_address = printer_address
+        self.channel_pool_size = channel_pool_size
+        
+        # Cada par ocupa permanentemente uma thread do servidor com seu
+        # ReleaseAccessStream (aberto durante toda a vida do cliente) e
+        # pode bloquear outra com um RequestAccess adiado. Abaixo de
+        # 2 x pares um RequestAccess fica sem thread, estoura o prazo e o
+        # solicitante entra na seção crítica sem a resposta deste cliente
+        min_workers = 2 * len(peer_addresses)
+        if grpc_workers is None:
+            grpc_workers = max(os.cpu_count() or 1, min_workers)
+        elif grpc_workers < min_workers:
+            _logger.warning(
+                "[Cliente %d] grpc_workers=%d insuficiente para %d pares; usando %d",
+                client_id, grpc_workers, len(peer_addresses), min_workers
+            )
+            grpc_workers = min_workers
+        self.grpc_workers = grpc_workers
         
         # Relógio de Lamport
         self.clock = LamportClock()
         
         # Estado da exclusão mútua
-        self.state = MutexState.RELEASED
+        self.state = RELEASED
         self.state_lock = threading.Lock()
         
         # Timestamp da requisição atual
         self.my_request_timestamp = 0
         self.request_number = 0
         
-        # Controle de respostas
-        self.pending_replies = 0
-        self.reply_lock = threading.Lock()
-        self.reply_event = threading.Event()
-        
-        # Fila de respostas adiadas
-        self.deferred_replies = []
-        self.deferred_lock = threading.Lock()
+        # Respostas adiadas: IDs dos clientes aguardando e uma única
+        # Condition acordada (notify_all) a cada liberação do recurso
+        self.deferred_replies = collections.deque()
+        self.release_cond = threading.Condition()
+        self.release_generation = 0
+        self.last_release_ts = 0
         
         # Servidor gRPC (este cliente como servidor)
         self.server = None
         
-        # Stubs para comunicação
-        self.printer_stub = None
-        self.peer_stubs = {}
+        # Pares ordenados por ID em sequências paralelas: todas as
+        # estruturas por par abaixo são indexadas pela posição em _peer_ids
+        self._peer_ids = tuple(sorted(peer_addresses))
+        self._peer_addresses = tuple(peer_addresses[peer_id] for peer_id in self._peer_ids)
+        
+        # Pools de canais/stubs para comunicação
+        self.printer_pool = None
+        self._peer_pools = [None] * len(self._peer_ids)
+        
+        # Streams de liberação por par: fila que alimenta o stream e a
+        # chamada gRPC em andamento
+        self._release_queues = [None] * len(self._peer_ids)
+        self._release_calls = [None] * len(self._peer_ids)
+        
+        # Protótipos das mensagens com os campos fixos deste cliente;
+        # cada envio copia o protótipo e preenche só os campos variáveis
+        self._access_request_proto = distributed_printing_pb2.AccessRequest(client_id=client_id)
+        self._access_release_proto = distributed_printing_pb2.AccessRelease(client_id=client_id)
+        self._print_request_proto = distributed_printing_pb2.PrintRequest(client_id=client_id)
         
         # Flag de execução
         self.running = True
     
-    def log(self, message):
-        """Imprime mensagem de log com informações do cliente"""
-        timestamp = self.clock.get_time()
-        state = self.state.value
-        print(f"[Cliente {self.client_id}, TS: {timestamp}, Estado: {state}] {message}")
+    def log(self, message, ts=None):
+        """
+        Imprime mensagem de log com informações do cliente.
+        
+        Args:
+            message (str): Mensagem a registrar
+            ts (int): Timestamp do evento, quando já conhecido; se omitido,
+                lê o valor atual do relógio
+        """
+        if ts is None:
+            ts = self.clock.get_time()
+        state = _STATE_NAMES[self.state]
+        _logger.info(
+            "[Cliente %d, TS: %d, Estado: %s] %s",
+            self.client_id, ts, state, message
+        )
     
     def start_server(self):
         """Inicia o servidor gRPC deste cliente"""
-        self.server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+        self.server = grpc.server(
+            futures.ThreadPoolExecutor(
+                max_workers=self.grpc_workers,
+                thread_name_prefix=f'cliente{self.client_id}'
+            ),
+            options=SERVER_OPTS
+        )
         
         distributed_printing_pb2_grpc.add_MutualExclusionServiceServicer_to_server(
             MutualExclusionServiceImpl(self),
@@ -205,15 +342,68 @@ class PrintingClient:
     def connect_to_peers(self):
         """Estabelece conexões com outros clientes e servidor de impressão"""
         # Conecta ao servidor de impressão
-        channel = grpc.insecure_channel(self.printer_address)
-        self.printer_stub = distributed_printing_pb2_grpc.PrintingServiceStub(channel)
+        self.printer_pool = ChannelPool(
+            self.printer_address,
+            distributed_printing_pb2_grpc.PrintingServiceStub,
+            self.channel_pool_size
+        )
         self.log(f"Conectado ao servidor de impressão em {self.printer_address}")
         
         # Conecta aos pares
-        for peer_id, peer_address in self.peer_addresses.items():
-            channel = grpc.insecure_channel(peer_address)
-            self.peer_stubs[peer_id] = distributed_printing_pb2_grpc.MutualExclusionServiceStub(channel)
-            self.log(f"Conectado ao Cliente {peer_id} em {peer_address}")
+        for idx, peer_address in enumerate(self._peer_addresses):
+            self._peer_pools[idx] = ChannelPool(
+                peer_address,
+                distributed_printing_pb2_grpc.MutualExclusionServiceStub,
+                self.channel_pool_size
+            )
+            self._open_release_stream(idx)
+            self.log(f"Conectado ao Cliente {self._peer_ids[idx]} em {peer_address}")
+    
+    def _open_release_stream(self, idx, pending=()):
+        """
+        Abre o stream de liberações para o par na posição idx.
+        
+        Args:
+            idx (int): Posição do par em _peer_ids
+            pending: Liberações a enviar antes das novas (de um stream caído)
+        """
+        release_queue = queue.SimpleQueue()
+        for release in pending:
+            release_queue.put(release)
+        self._release_queues[idx] = release_queue
+        # O gRPC consome o iterador em uma thread própria até receber None.
+        # wait_for_ready: um par que ainda não subiu não derruba o stream,
+        # que aguarda a conexão em vez de falhar na hora
+        self._release_calls[idx] = self._peer_pools[idx].next_stub().ReleaseAccessStream.future(
+            iter(release_queue.get, None),
+            wait_for_ready=True
+        )
+    
+    def _send_release(self, idx, release):
+        """Envia uma liberação pelo stream do par, reabrindo-o se tiver caído"""
+        call = self._release_calls[idx]
+        if call.done():
+            error = call.exception()
+            if error is not None:
+                self.log(f"Erro ao notificar Cliente {self._peer_ids[idx]}: {error.code()}")
+            
+            # Liberações que o stream caído não chegou a consumir seguem
+            # pelo novo stream, antes desta
+            old_queue = self._release_queues[idx]
+            pending = []
+            while True:
+                try:
+                    pending.append(old_queue.get_nowait())
+                except queue.Empty:
+                    break
+            if pending:
+                self.log(
+                    f"Reenviando {len(pending)} liberação(ões) pendente(s) "
+                    f"ao Cliente {self._peer_ids[idx]}"
+                )
+            self._open_release_stream(idx, pending)
+        
+        self._release_queues[idx].put(release)
     
     def request_critical_section(self):
         """
@@ -222,67 +412,59 @@ class PrintingClient:
         """
         # Muda estado para WANTED
         with self.state_lock:
-            self.state = MutexState.WANTED
+            self.state = WANTED
             self.my_request_timestamp = self.clock.tick()
             self.request_number += 1
         
         req_ts = self.my_request_timestamp
         req_num = self.request_number
         
-        self.log(f"Requisitando acesso (Req #{req_num})...")
+        self.log(f"Requisitando acesso (Req #{req_num})...", ts=req_ts)
         
-        # Prepara para receber respostas
-        with self.reply_lock:
-            self.pending_replies = len(self.peer_stubs)
-            self.reply_event.clear()
+        # Uma única mensagem, serializada pelo gRPC para cada par
+        request = distributed_printing_pb2.AccessRequest()
+        request.CopyFrom(self._access_request_proto)
+        request.lamport_timestamp = req_ts
+        request.request_number = req_num
         
-        # Envia requisições para todos os pares
-        for peer_id, stub in self.peer_stubs.items():
+        # Envia requisições para todos os pares sem criar threads: os
+        # futures do gRPC são completados pelas threads internas do gRPC
+        # Prazo único para toda a rodada, independente da ordem de envio
+        deadline = time.monotonic() + _REQUEST_TIMEOUT
+        calls = []
+        for idx, pool in enumerate(self._peer_pools):
             try:
-                request = distributed_printing_pb2.AccessRequest(
-                    client_id=self.client_id,
-                    lamport_timestamp=req_ts,
-                    request_number=req_num
-                )
-                
-                # Chamada assíncrona
-                def send_request(pid, s, req):
-                    try:
-                        response = s.RequestAccess(req, timeout=5.0)
-                        # Atualiza relógio com resposta
-                        self.clock.update(response.lamport_timestamp)
-                        
-                        # Decrementa contador de respostas pendentes
-                        with self.reply_lock:
-                            self.pending_replies -= 1
-                            if self.pending_replies == 0:
-                                self.reply_event.set()
-                    except grpc.RpcError as e:
-                        self.log(f"Erro ao contatar Cliente {pid}: {e.code()}")
-                        # Considera como resposta recebida
-                        with self.reply_lock:
-                            self.pending_replies -= 1
-                            if self.pending_replies == 0:
-                                self.reply_event.set()
-                
-                thread = threading.Thread(
-                    target=send_request,
-                    args=(peer_id, stub, request)
-                )
-                thread.start()
-                
+                calls.append((idx, pool.next_stub().RequestAccess.future(request, timeout=_REQUEST_TIMEOUT)))
             except Exception as e:
-                self.log(f"Erro ao enviar requisição para Cliente {peer_id}: {e}")
+                self.log(f"Erro ao enviar requisição para Cliente {self._peer_ids[idx]}: {e}")
         
         # Aguarda todas as respostas
-        self.log(f"Aguardando respostas de {len(self.peer_stubs)} clientes...")
-        self.reply_event.wait()
+        self.log(f"Aguardando respostas de {len(self._peer_ids)} clientes...", ts=req_ts)
+        latest_ts = None
+        for idx, call in calls:
+            try:
+                response = call.result(timeout=max(0.0, deadline - time.monotonic()))
+                if latest_ts is None or response.lamport_timestamp > latest_ts:
+                    latest_ts = response.lamport_timestamp
+            except grpc.FutureTimeoutError:
+                # Prazo da rodada esgotado: cancela a chamada e, como nos
+                # erros abaixo, considera como resposta recebida
+                call.cancel()
+                self.log(f"Sem resposta do Cliente {self._peer_ids[idx]} no prazo")
+            except grpc.RpcError as e:
+                # Considera como resposta recebida
+                self.log(f"Erro ao contatar Cliente {self._peer_ids[idx]}: {e.code()}")
+        
+        # Uma única atualização do relógio com a maior resposta recebida
+        entry_ts = None
+        if latest_ts is not None:
+            entry_ts = self.clock.update(latest_ts)
         
         # Todas as respostas recebidas, pode entrar na seção crítica
         with self.state_lock:
-            self.state = MutexState.HELD
+            self.state = HELD
         
-        self.log(f"Acesso concedido! Entrando na seção crítica.")
+        self.log(f"Acesso concedido! Entrando na seção crítica.", ts=entry_ts)
     
     def release_critical_section(self):
         """
@@ -292,43 +474,37 @@ class PrintingClient:
         
         # Muda estado para RELEASED
         with self.state_lock:
-            self.state = MutexState.RELEASED
+            self.state = RELEASED
         
         # Incrementa timestamp
         release_ts = self.clock.tick()
         
-        self.log(f"Liberando recurso (Req #{req_num})...")
+        self.log(f"Liberando recurso (Req #{req_num})...", ts=release_ts)
         
-        # Responde requisições adiadas
-        with self.deferred_lock:
-
-            ## CORREÇÃO DE SEÇÃO CRÍTICA
-            # 'self.deferred_replies' agora contém (peer_id, reply_event)
-
-            for peer_id, reply_event in self.deferred_replies:
-                self.log(f"Respondendo requisição adiada do Cliente {peer_id}")
-
-                try:
-                    # 1. Dispara o evento
-                    reply_event.set()
-                    # 2. Isso fará a thread 'RequestAccess' daquele cliente (que estava em 'reply_event.wait()')
-                    #    acordar e finalmente retornar a resposta AccessResponse(True)
-                except Exception as e:
-                    self.log(f"Erro ao disparar evento para Cliente {peer_id}: {e}")
-            
-            self.deferred_replies.clear()
+        # Responde requisições adiadas: um único tick e um único notify_all
+        # acordam todas as threads 'RequestAccess' que estavam esperando
+        with self.release_cond:
+            self.last_release_ts = release_ts
+            self.release_generation += 1
+            self.release_cond.notify_all()
         
-        # Notifica todos os pares sobre liberação
-        for peer_id, stub in self.peer_stubs.items():
+        # Só esta thread consome a fila e as fases de liberação nunca se
+        # sobrepõem, então popleft() dispensa lock
+        while True:
             try:
-                release = distributed_printing_pb2.AccessRelease(
-                    client_id=self.client_id,
-                    lamport_timestamp=release_ts,
-                    request_number=req_num
-                )
-                stub.ReleaseAccess(release, timeout=5.0)
-            except grpc.RpcError as e:
-                self.log(f"Erro ao notificar Cliente {peer_id}: {e.code()}")
+                peer_id = self.deferred_replies.popleft()
+            except IndexError:
+                break
+            self.log(f"Respondendo requisição adiada do Cliente {peer_id}", ts=release_ts)
+        
+        release = distributed_printing_pb2.AccessRelease()
+        release.CopyFrom(self._access_release_proto)
+        release.lamport_timestamp = release_ts
+        release.request_number = req_num
+        
+        # Notifica todos os pares sobre liberação
+        for idx in range(len(self._peer_ids)):
+            self._send_release(idx, release)
     
     def print_document(self, message):
         """
@@ -337,25 +513,24 @@ class PrintingClient:
         print_ts = self.clock.tick()
         req_num = self.request_number
         
-        self.log(f"Enviando para impressora...")
+        self.log(f"Enviando para impressora...", ts=print_ts)
         
         try:
-            request = distributed_printing_pb2.PrintRequest(
-                client_id=self.client_id,
-                message_content=message,
-                lamport_timestamp=print_ts,
-                request_number=req_num
-            )
+            request = distributed_printing_pb2.PrintRequest()
+            request.CopyFrom(self._print_request_proto)
+            request.message_content = message
+            request.lamport_timestamp = print_ts
+            request.request_number = req_num
             
-            response = self.printer_stub.SendToPrinter(request, timeout=10.0)
+            response = self.printer_pool.next_stub().SendToPrinter(request, timeout=10.0)
             
             # Atualiza relógio
-            self.clock.update(response.lamport_timestamp)
+            response_ts = self.clock.update(response.lamport_timestamp)
             
             if response.success:
-                self.log(f"Impressão concluída: {response.confirmation_message}")
+                self.log(f"Impressão aceita: {response.confirmation_message}", ts=response_ts)
             else:
-                self.log(f"Falha na impressão")
+                self.log(f"Falha na impressão", ts=response_ts)
                 
         except grpc.RpcError as e:
             self.log(f"Erro ao imprimir: {e.code()}")
@@ -385,14 +560,14 @@ class PrintingClient:
         
         while self.running:
             # Aguarda intervalo aleatório
-            delay = random.uniform(interval_range[0], interval_range[1])
+            delay = _rng().uniform(interval_range[0], interval_range[1])
             time.sleep(delay)
             
             if not self.running:
                 break
             
             # Escolhe mensagem aleatória
-            message = random.choice(messages)
+            message = _rng().choice(messages)
             
             # Solicita impressão
             self.request_to_print(message)
@@ -404,6 +579,17 @@ class PrintingClient:
         
         if self.server:
             self.server.stop(0)
+        
+        # Encerra os streams de liberação
+        for release_queue in self._release_queues:
+            if release_queue is not None:
+                release_queue.put(None)
+        
+        if self.printer_pool:
+            self.printer_pool.close()
+        for pool in self._peer_pools:
+            if pool is not None:
+                pool.close()
 
 
 def parse_arguments():
@@ -438,6 +624,16 @@ def parse_arguments():
         help='Endereço do servidor de impressão (padrão: localhost:50051)'
     )
     
+    parser.add_argument(
+        '--grpc-workers',
+        type=int,
+        default=None,
+        help='Threads do servidor gRPC deste cliente. Cada par prende uma '
+             'thread permanentemente com seu stream de liberações e pode '
+             'bloquear outra com uma requisição adiada, então valores abaixo '
+             'de 2 x pares são elevados a esse mínimo (padrão: max(núcleos, 2 x pares))'
+    )
+    
     return parser.parse_args()
 
 
@@ -460,7 +656,8 @@ def main():
         client_id=args.id,
         port=args.port,
         peer_addresses=peer_addresses,
-        printer_address=args.printer
+        printer_address=args.printer,
+        grpc_workers=args.grpc_workers
     )
     
     # Inicia servidor
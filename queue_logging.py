@@ -0,0 +1,49 @@
+"""
+Logging Assíncrono via Fila
+As threads do gRPC apenas enfileiram os registros; uma única thread
+(QueueListener) formata as mensagens e escreve no stdout.
+"""
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler que enfileira o LogRecord sem formatá-lo.
+    A formatação (msg % args) fica para a thread do listener.
+    """
+    
+    def prepare(self, record):
+        return record
+
+
+_log_queue = queue.SimpleQueue()
+
+_stream_handler = logging.StreamHandler(sys.stdout)
+_stream_handler.setFormatter(logging.Formatter('%(message)s'))
+
+_listener = logging.handlers.QueueListener(_log_queue, _stream_handler)
+_listener.start()
+# Esvazia a fila antes de o interpretador encerrar
+atexit.register(_listener.stop)
+
+
+def get_logger(name):
+    """
+    Retorna um logger que escreve através da fila compartilhada.
+    
+    Args:
+        name (str): Nome do logger
+    
+    Returns:
+        logging.Logger: Logger configurado
+    """
+    logger = logging.getLogger(name)
+    if not logger.handlers:
+        logger.addHandler(DeferredQueueHandler(_log_queue))
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    return logger
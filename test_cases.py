@@ -2,20 +2,61 @@
 Testes automatizados para o sistema de impressão distribuída
 """
 import unittest
+import collections
+import io
+import os
+import socket
+import sys
 import threading
 import time
 from lamport_clock import LamportClock
-import grpc
 from concurrent import futures
 
-import distributed_printing_pb2
-import distributed_printing_pb2_grpc
-from printing_client import PrintingClient, MutexState
+# A pilha gRPC é opcional: sem ela, só os testes de integração são pulados
+try:
+    import grpc
+    import distributed_printing_pb2
+    import distributed_printing_pb2_grpc
+    _HAS_GRPC = True
+except ImportError:
+    _HAS_GRPC = False
+
+# O módulo testado fica fora do try: um erro nele deve falhar, não pular
+if _HAS_GRPC:
+    from printing_client import (
+        PrintingClient, MutualExclusionServiceImpl, RELEASED, HELD
+    )
+
+# Porta do servidor de impressão usado nos testes de integração
+_TEST_PRINTER_PORT = 50051
+
+# Timestamps recebidos em test_concurrent_updates (e o maior deles)
+_CONCURRENT_TS = (5, 10, 3, 15, 7, 12, 20, 1, 18, 9)
+_CONCURRENT_TS_MAX = max(_CONCURRENT_TS)
+
+
+def _tick_worker(clock, start_gate, n):
+    """Aguarda a largada e executa n ticks, devolvendo os valores obtidos."""
+    start_gate.wait()
+    # Acumula localmente e devolve tudo de uma vez no fim
+    local = []
+    for _ in range(n):
+        local.append(clock.tick())
+    return local
 
 
 class TestLamportClock(unittest.TestCase):
     """Testes para o Relógio de Lamport"""
     
+    @classmethod
+    def setUpClass(cls):
+        # Threads de trabalho reaproveitadas entre os testes concorrentes
+        cls.pool = futures.ThreadPoolExecutor(max_workers=16)
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.shutdown()
+    
     def test_initialization(self):
         """Testa inicialização do relógio"""
         clock = LamportClock()
@@ -34,68 +75,30 @@ class TestLamportClock(unittest.TestCase):
         time3 = clock.tick()
         self.assertEqual(time3, 3)
     
-    def test_update_with_higher_timestamp(self):
-        """Testa atualização com timestamp maior"""
-        clock = LamportClock()
-        clock.tick()  # time = 1
-        clock.tick()  # time = 2
-        
-        # Recebe timestamp 10
-        new_time = clock.update(10)
-        self.assertEqual(new_time, 11)  # max(2, 10) + 1
-        
-        # Próximo tick deve ser 12
-        next_time = clock.tick()
-        self.assertEqual(next_time, 12)
-    
-    def test_update_with_lower_timestamp(self):
-        """Testa atualização com timestamp menor"""
-        clock = LamportClock()
-        for _ in range(5):
-            clock.tick()  # time = 5
-        
-        # Recebe timestamp 2 (menor que atual)
-        new_time = clock.update(2)
-        self.assertEqual(new_time, 6)  # max(5, 2) + 1
-    
-    def test_update_with_equal_timestamp(self):
-        """Testa atualização com timestamp igual"""
-        clock = LamportClock()
-        for _ in range(5):
-            clock.tick()  # time = 5
-        
-        # Recebe timestamp 5 (igual ao atual)
-        new_time = clock.update(5)
-        self.assertEqual(new_time, 6)  # max(5, 5) + 1
+    def test_update_matrix(self):
+        """Testa atualização com timestamp maior, menor e igual ao local"""
+        # (ticks locais, timestamp recebido, esperado = max(local, recebido) + 1)
+        cases = [(2, 10, 11), (5, 2, 6), (5, 5, 6)]
+        for start, incoming, expected in cases:
+            with self.subTest(start=start, incoming=incoming):
+                clock = LamportClock()
+                for _ in range(start):
+                    clock.tick()
+                
+                self.assertEqual(clock.update(incoming), expected)
+                
+                # Próximo tick continua a partir do valor atualizado
+                self.assertEqual(clock.tick(), expected + 1)
     
     def test_thread_safety(self):
         """Testa thread safety do relógio"""
         clock = LamportClock()
-        results = []
-        errors = []
+        # Libera todas as threads ao mesmo tempo para gerar contenção real
+        start_gate = threading.Barrier(5)
         
-        def tick_multiple_times(n):
-            try:
-                for _ in range(n):
-                    t = clock.tick()
-                    results.append(t)
-                    time.sleep(0.001)
-            except Exception as e:
-                errors.append(e)
-        
-        # Cria múltiplas threads
-        threads = []
-        for _ in range(5):
-            t = threading.Thread(target=tick_multiple_times, args=(20,))
-            threads.append(t)
-            t.start()
-        
-        # Aguarda conclusão
-        for t in threads:
-            t.join()
-        
-        # Verifica se não houve erros
-        self.assertEqual(len(errors), 0)
+        # Dispara as tarefas no pool; result() repassa exceções das threads
+        futs = [self.pool.submit(_tick_worker, clock, start_gate, 20) for _ in range(5)]
+        results = [t for f in futs for t in f.result()]
         
         # Verifica se todos os valores são únicos e crescentes
         results.sort()
@@ -105,30 +108,77 @@ class TestLamportClock(unittest.TestCase):
     def test_concurrent_updates(self):
         """Testa atualizações concorrentes"""
         clock = LamportClock()
-        results = []
         
-        def update_with_random_timestamp(ts):
-            new_time = clock.update(ts)
-            results.append(new_time)
-        
-        # Cria threads com diferentes timestamps
-        threads = []
-        timestamps = [5, 10, 3, 15, 7, 12, 20, 1, 18, 9]
-        
-        for ts in timestamps:
-            t = threading.Thread(target=update_with_random_timestamp, args=(ts,))
-            threads.append(t)
-            t.start()
-        
-        for t in threads:
-            t.join()
+        # Submete updates com diferentes timestamps
+        futs = [self.pool.submit(clock.update, ts) for ts in _CONCURRENT_TS]
+        results = [f.result() for f in futs]
         
         # Todos os valores devem ser maiores que 0
         self.assertTrue(all(r > 0 for r in results))
         
         # Valor final deve ser maior que todos os timestamps recebidos
         final_time = clock.get_time()
-        self.assertGreaterEqual(final_time, max(timestamps))
+        self.assertGreaterEqual(final_time, _CONCURRENT_TS_MAX)
+    
+    def test_updates_mixed_with_ticks(self):
+        """Testa updates atrasados e adiantados concorrendo com ticks"""
+        clock = LamportClock()
+        results = []
+        updates = []
+        
+        def tick_and_update(offset):
+            for i in range(50):
+                results.append(clock.tick())
+                # Alterna entre timestamp atrasado (caminho rápido) e adiantado
+                received = offset + i * 3 if i % 2 else 0
+                new_time = clock.update(received)
+                updates.append((received, new_time))
+                results.append(new_time)
+        
+        futs = [self.pool.submit(tick_and_update, offset) for offset in range(4)]
+        for f in futs:
+            f.result()
+        
+        # Nenhum timestamp pode ser emitido duas vezes
+        self.assertEqual(len(results), 400)
+        self.assertEqual(len(set(results)), 400)
+        self.assertTrue(all(new > received for received, new in updates))
+        self.assertEqual(clock.get_time(), max(results))
+    
+    def test_stale_update_short_circuits_to_tick(self):
+        """Testa que update com timestamp <= local equivale a um tick()"""
+        clock = LamportClock()
+        for _ in range(5):
+            clock.tick()  # time = 5
+        
+        # Conta as chamadas de tick() feitas por update()
+        ticks = []
+        original_tick = clock.tick
+        
+        def counting_tick():
+            ticks.append(None)
+            return original_tick()
+        
+        clock.tick = counting_tick
+        
+        self.assertEqual(clock.update(2), 6)   # menor que o local
+        self.assertEqual(clock.update(6), 7)   # igual ao local
+        self.assertEqual(len(ticks), 2)
+        
+        # Timestamp adiantado segue pelo max() e não chama tick()
+        self.assertEqual(clock.update(10), 11)
+        self.assertEqual(len(ticks), 2)
+    
+    def test_update_with_huge_timestamp(self):
+        """Testa que um timestamp muito adiantado não trava o relógio"""
+        clock = LamportClock()
+        clock.tick()  # time = 1
+        
+        # Timestamp vindo da rede (int64): o salto deve ser O(1)
+        received = 2 ** 62
+        new_time = self.pool.submit(clock.update, received).result(timeout=1.0)
+        self.assertEqual(new_time, received + 1)
+        self.assertEqual(clock.tick(), received + 2)
 
 
 class TestMutexLogic(unittest.TestCase):
@@ -156,12 +206,8 @@ class TestMutexLogic(unittest.TestCase):
     
     def _has_priority(self, my_ts, my_id, other_ts, other_id):
         """Implementa lógica de prioridade"""
-        if my_ts < other_ts:
-            return True
-        elif my_ts == other_ts:
-            return my_id < other_id
-        else:
-            return False
+        # Comparação lexicográfica: timestamp primeiro, ID no desempate
+        return (my_ts, my_id) < (other_ts, other_id)
 
 
 class TestCausalOrdering(unittest.TestCase):
@@ -252,10 +298,69 @@ class TestSystemIntegration(unittest.TestCase):
         # Ordena por timestamp (e ID para desempate)
         requests.sort(key=lambda x: (x[1], x[0]))
         
-        # Primeiro da fila deve ter menor timestamp
-        first_client, first_ts = requests[0]
-        for client, ts in requests[1:]:
-            self.assertGreaterEqual(ts, first_ts)
+        # Todos pedem com TS 1 (primeiro evento), então o desempate por ID
+        # define a fila
+        self.assertEqual(requests, [(0, 1), (1, 1), (2, 1)])
+
+
+@unittest.skipUnless(_HAS_GRPC, "grpc stack not available")
+class TestPrintingClientConfig(unittest.TestCase):
+    """Testes do PrintingClient que não sobem servidores gRPC"""
+    
+    def test_grpc_workers_minimum(self):
+        """Testa que grpc_workers nunca fica abaixo de 2 x pares"""
+        peers = {2: 'localhost:6022', 3: 'localhost:6023'}
+        client = PrintingClient(client_id=1, port=6021, peer_addresses=peers,
+                                printer_address='localhost:50051',
+                                grpc_workers=2)
+        # Um stream de liberação e um RequestAccess adiado por par
+        self.assertEqual(client.grpc_workers, 4)
+    
+    def test_abandoned_deferred_request_frees_worker(self):
+        """Testa que um RequestAccess adiado e abandonado libera a thread"""
+        client = PrintingClient(client_id=1, port=6031, peer_addresses={2: 'localhost:6032'},
+                                printer_address='localhost:50051')
+        with client.state_lock:
+            client.state = HELD
+        
+        class FakeContext:
+            """Contexto mínimo: o solicitante desiste quando abandon() é chamado"""
+            def __init__(self):
+                self.active = True
+                self.callbacks = []
+            
+            def add_callback(self, callback):
+                self.callbacks.append(callback)
+                return True
+            
+            def is_active(self):
+                return self.active
+            
+            def abandon(self):
+                self.active = False
+                for callback in self.callbacks:
+                    callback()
+        
+        context = FakeContext()
+        request = distributed_printing_pb2.AccessRequest(
+            client_id=2, lamport_timestamp=1, request_number=1
+        )
+        servicer = MutualExclusionServiceImpl(client)
+        
+        with futures.ThreadPoolExecutor(max_workers=1) as pool:
+            fut = pool.submit(servicer.RequestAccess, request, context)
+            # Aguarda o pedido ser adiado antes de abandoná-lo
+            deadline = time.perf_counter() + 1.0
+            while not client.deferred_replies:
+                self.assertLess(time.perf_counter(), deadline)
+                time.sleep(0.001)
+            self.assertFalse(fut.done())
+            
+            context.abandon()
+            # Sem liberação do recurso: a thread deve voltar pelo callback
+            response = fut.result(timeout=1.0)
+        
+        self.assertFalse(response.access_granted)
 
 
 def run_tests():
@@ -265,21 +370,21 @@ def run_tests():
     print("="*60)
     print()
     
-    # Cria suite de testes
-    loader = unittest.TestLoader()
-    suite = unittest.TestSuite()
+    # Cria suite com todas as classes de teste do módulo
+    suite = unittest.defaultTestLoader.loadTestsFromModule(sys.modules[__name__])
     
-    # Adiciona testes
-    suite.addTests(loader.loadTestsFromTestCase(TestLamportClock))
-    suite.addTests(loader.loadTestsFromTestCase(TestMutexLogic))
-    suite.addTests(loader.loadTestsFromTestCase(TestCausalOrdering))
-    suite.addTests(loader.loadTestsFromTestCase(TestSystemIntegration))
-    suite.addTests(loader.loadTestsFromTestCase(TestDistributedPrintingIntegration))
+    # Em CI: saída resumida, acumulada em memória e escrita de uma só vez
+    in_ci = bool(os.environ.get('CI'))
+    stream = io.StringIO() if in_ci else sys.stderr
     
     # Executa testes
-    runner = unittest.TextTestRunner(verbosity=2)
+    runner = unittest.TextTestRunner(stream=stream, verbosity=1 if in_ci else 2)
     result = runner.run(suite)
     
+    if in_ci:
+        sys.stderr.write(stream.getvalue())
+        sys.stderr.flush()
+    
     # Resumo
     print()
     print("="*60)
@@ -294,19 +399,29 @@ def run_tests():
     return result.wasSuccessful()
 
 
+@unittest.skipUnless(_HAS_GRPC, "grpc stack not available")
 class TestDistributedPrintingIntegration(unittest.TestCase):
     """Testes de integração para os cenários descritos pelo usuário
     Cenário 1: Funcionamento Básico sem Concorrência
     Cenário 2: Concorrência entre clientes A e B enquanto C está usando
     """
 
-    def setUp(self):
-        # Criar um servicer de impressão de teste que registra a sequência de impressões
-        self.printed_sequence = []
+    @classmethod
+    def setUpClass(cls):
+        # Pula a classe se a porta do servidor de impressão já estiver em uso
+        probe = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        probe.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            probe.bind(('', _TEST_PRINTER_PORT))
+        except OSError:
+            raise unittest.SkipTest(f"porta {_TEST_PRINTER_PORT} ocupada")
+        finally:
+            probe.close()
 
+        # Servicer de impressão de teste que registra a sequência de impressões
         class TestPrinterServicer(distributed_printing_pb2_grpc.PrintingServiceServicer):
-            def __init__(self, outer_list):
-                self.outer = outer_list
+            def __init__(self):
+                self.outer = []
                 self.print_count = 0
 
             def SendToPrinter(self, request, context):
@@ -319,28 +434,44 @@ class TestDistributedPrintingIntegration(unittest.TestCase):
                     lamport_timestamp=request.lamport_timestamp
                 )
 
-        # Inicia servidor de impressão de teste em 50051
-        self.printer_servicer = TestPrinterServicer(self.printed_sequence)
-        self.printer_server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+        # Um único servidor de impressão de teste em 50051 para todos os cenários.
+        # A exclusão mútua garante no máximo uma impressão por vez, então
+        # dois workers bastam
+        cls.printer_servicer = TestPrinterServicer()
+        cls.printer_server = grpc.server(futures.ThreadPoolExecutor(max_workers=2))
         distributed_printing_pb2_grpc.add_PrintingServiceServicer_to_server(
-            self.printer_servicer, self.printer_server
+            cls.printer_servicer, cls.printer_server
         )
-        self.printer_server.add_insecure_port('[::]:50051')
-        self.printer_server.start()
+        cls.printer_server.add_insecure_port(f'[::]:{_TEST_PRINTER_PORT}')
+        cls.printer_server.start()
 
-        # Lista para manter referências dos clientes criados e encerrá-los no tearDown
-        self.clients = []
+        # Pool para os fluxos concorrentes dos cenários
+        cls.pool = futures.ThreadPoolExecutor(max_workers=16)
 
-        # Pequena pausa para garantir que o servidor esteja pronto
-        time.sleep(0.2)
+        # Aguarda o servidor aceitar conexões em vez de uma pausa fixa
+        channel = grpc.insecure_channel(f'localhost:{_TEST_PRINTER_PORT}')
+        grpc.channel_ready_future(channel).result(timeout=2)
+        channel.close()
 
-    def tearDown(self):
+    @classmethod
+    def tearDownClass(cls):
         # Parar servidor de impressão
         try:
-            self.printer_server.stop(0)
+            cls.printer_server.stop(0)
         except Exception:
             pass
+        cls.pool.shutdown()
+
+    def setUp(self):
+        # Sequência de impressões nova para cada teste
+        self.printed_sequence = collections.deque()
+        self.printer_servicer.outer = self.printed_sequence
+        self.printer_servicer.print_count = 0
+
+        # Lista para manter referências dos clientes criados e encerrá-los no tearDown
+        self.clients = []
 
+    def tearDown(self):
         # Encerrar clientes criados
         for c in self.clients:
             try:
@@ -348,6 +479,14 @@ class TestDistributedPrintingIntegration(unittest.TestCase):
             except Exception:
                 pass
 
+    def _wait_for(self, predicate, timeout=1.0):
+        """Aguarda predicate() ficar verdadeiro, falhando após timeout segundos."""
+        start = time.perf_counter()
+        while not predicate():
+            if time.perf_counter() - start > timeout:
+                self.fail('timeout')
+            time.sleep(0.001)
+
     def _create_clients(self, client_defs):
         """Helper que cria, inicia servidores e conecta clientes.
 
@@ -359,15 +498,20 @@ class TestDistributedPrintingIntegration(unittest.TestCase):
 
         clients = {}
         for cid, port in client_defs:
-            # peers less self
-            peer_map = {k: v for k, v in peers.items() if k != cid}
-            client = PrintingClient(client_id=cid, port=port, peer_addresses=peer_map, printer_address='localhost:50051')
+            # peers less self: cópia O(N) e remoção O(1) do próprio ID
+            peer_map = peers.copy()
+            del peer_map[cid]
+            client = PrintingClient(client_id=cid, port=port, peer_addresses=peer_map, printer_address=f'localhost:{_TEST_PRINTER_PORT}')
             client.start_server()
             # guardar para tearDown
             self.clients.append(client)
 
-        # small delay to ensure client servers are up
-        time.sleep(0.2)
+            # Aguarda o servidor do cliente aceitar conexões
+            channel = grpc.insecure_channel(f'localhost:{port}')
+            try:
+                grpc.channel_ready_future(channel).result(timeout=2.0)
+            finally:
+                channel.close()
 
         # Now connect to peers (after all servers started)
         for client in self.clients:
@@ -391,15 +535,15 @@ class TestDistributedPrintingIntegration(unittest.TestCase):
         # Executa fluxo de requisição/print/liberação
         client_a.request_to_print("Mensagem do Cliente A - Sem concorrência")
 
-        # Pequena pausa para garantir que o envio chegou no servidor de impressão
-        time.sleep(0.1)
+        # Aguarda o envio chegar no servidor de impressão
+        self._wait_for(lambda: len(self.printed_sequence) == 1)
 
         # Verifica que a impressora recebeu exatamente uma impressão
         self.assertEqual(len(self.printed_sequence), 1)
         self.assertEqual(self.printed_sequence[0][0], 1)  # primeiro campo é client_id
 
         # Cliente A deve ter liberado o recurso
-        self.assertEqual(client_a.state, MutexState.RELEASED)
+        self.assertEqual(client_a.state, RELEASED)
 
     def test_scenario_2_concurrency(self):
         print("\n\n\nCenário 2: Clientes A e B solicitam simultaneamente enquanto C está usando.\n\n", end='')
@@ -412,42 +556,59 @@ class TestDistributedPrintingIntegration(unittest.TestCase):
         client_b = clients[2]
         client_c = clients[3]
 
+        # Sinais de sincronização: C na seção crítica e C adiou a resposta
+        # a cada cliente (a fila de adiados de C avisa ao receber um ID)
+        c_in_cs = threading.Event()
+        deferred_by_c = {1: threading.Event(), 2: threading.Event()}
+
+        class SignalingDeque(collections.deque):
+            def append(self, client_id):
+                super().append(client_id)
+                deferred_by_c[client_id].set()
+
+        client_c.deferred_replies = SignalingDeque()
+
         # Definir threads para simular comportamento
+        # As asserções dentro dos fluxos levantam AssertionError na thread
+        # do pool; result() a repassa para o teste
         def c_work():
             # C entra primeiro e segura a seção crítica
             client_c.request_critical_section()
-            # Mantém recurso ocupado para que A e B enviem requisições enquanto C está HELD
-            time.sleep(0.4)
-            # Faz a impressão enquanto está na seção crítica
-            client_c.print_document("Mensagem do Cliente C")
-            # Libera recurso
-            client_c.release_critical_section()
+            c_in_cs.set()
+            try:
+                # Mantém recurso ocupado até A e B terem requisitado enquanto C está HELD
+                self.assertTrue(deferred_by_c[1].wait(timeout=5.0),
+                                "C não recebeu a requisição de A")
+                self.assertTrue(deferred_by_c[2].wait(timeout=5.0),
+                                "C não recebeu a requisição de B")
+                # Faz a impressão enquanto está na seção crítica
+                client_c.print_document("Mensagem do Cliente C")
+            finally:
+                # Libera recurso mesmo em falha, para A e B não ficarem presos
+                client_c.release_critical_section()
 
         def a_work():
-            # A solicita um pouco antes de B para ter menor timestamp
-            time.sleep(0.05)
+            # A solicita assim que C estiver na seção crítica
+            self.assertTrue(c_in_cs.wait(timeout=5.0),
+                            "C não entrou na seção crítica")
             client_a.request_to_print("Mensagem do Cliente A")
 
         def b_work():
-            # B solicita logo em seguida
-            time.sleep(0.09)
+            # B só solicita depois que a requisição de A chegou a C,
+            # garantindo que A tenha o menor timestamp
+            self.assertTrue(deferred_by_c[1].wait(timeout=5.0),
+                            "requisição de A não chegou a C")
             client_b.request_to_print("Mensagem do Cliente B")
 
-        # Inicia threads
-        t_c = threading.Thread(target=c_work)
-        t_a = threading.Thread(target=a_work)
-        t_b = threading.Thread(target=b_work)
-
-        t_c.start()
-        # Garante que C iniciou antes de A/B
-        time.sleep(0.02)
-        t_a.start()
-        t_b.start()
-
-        # Aguarda término
-        t_a.join()
-        t_b.join()
-        t_c.join()
+        # Dispara os três fluxos no pool
+        f_c = self.pool.submit(c_work)
+        f_a = self.pool.submit(a_work)
+        f_b = self.pool.submit(b_work)
+
+        # Aguarda término; C primeiro, pois sua falha explica as dos demais
+        f_c.result()
+        f_a.result()
+        f_b.result()
 
         # Deve ter 3 impressões: C primeiro, depois A (menor ts) depois B
         self.assertEqual(len(self.printed_sequence), 3)